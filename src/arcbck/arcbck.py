@@ -2,34 +2,31 @@ import logging
 import os
 from arcgis.gis import GIS
 from datetime import datetime
+from functools import lru_cache, partial
 import shutil
 import re
 import time
-import queue
 import uuid
 import json
 import threading
+import itertools
+from concurrent.futures import ThreadPoolExecutor, as_completed
 LOGGER = logging.getLogger(__name__)
 
-class StoppableThread(threading.Thread):
-    def __init__(self, target=None, args=(), kwargs=None):
-        super().__init__()
-        self._target = target
-        self._args = args
-        self._kwargs = kwargs if kwargs is not None else {}
-        self._stop_event = threading.Event()
-
-    def run(self):
-        if self._target:
-            while not self._stop_event.is_set():
-                self._target(*self._args, **self._kwargs)
-                if self._stop_event.is_set():
-                    break
-                # Optional: Sleep for a short period to avoid tight loop
-                time.sleep(0.1)
-                
-    def stop(self):
-        self._stop_event.set()
+_log_lock = threading.Lock()
+
+# Minimum seconds between routine rewrites of the JSON log
+_LOG_SAVE_INTERVAL = 1.0
+_last_log_save = [0.0]
+
+# Upper bound on old backups deleted at once, to avoid flooding the filesystem
+_DELETE_WORKERS = 8
+
+# Longest wait in seconds before retrying a failed item
+_MAX_RETRY_DELAY = 30
+
+# Number of items requested per page of search results
+_SEARCH_PAGE_SIZE = 100
 
 backup_log = {
     'info': {
@@ -44,53 +41,115 @@ backup_log = {
 }
 
 
-def _convert_date_format_to_regex(date_format: str) -> str:
-    """Convert a date format string to a regular expression pattern."""
-    format_map = {
-        '%Y': r'\d{4}',      # Year
-        '%m': r'\d{2}',      # Month
-        '%d': r'\d{2}',      # Day
-        '%H': r'\d{2}',      # Hour (if needed)
-        '%M': r'\d{2}',      # Minute (if needed)
-        '%S': r'\d{2}'       # Second (if needed)
-    }
+# Regular expression for each supported date format directive, with a named group per field
+_DATE_FORMAT_MAP = {
+    '%Y': r'(?P<Y>\d{4})',      # Year
+    '%m': r'(?P<m>\d{2})',      # Month
+    '%d': r'(?P<d>\d{2})',      # Day
+    '%H': r'(?P<H>\d{2})',      # Hour (if needed)
+    '%M': r'(?P<M>\d{2})',      # Minute (if needed)
+    '%S': r'(?P<S>\d{2})'       # Second (if needed)
+}
+_DATE_DIRECTIVE_PATTERN = re.compile('|'.join(map(re.escape, _DATE_FORMAT_MAP)))
 
-    regex_pattern = date_format
-    for py_format, regex in format_map.items():
-        regex_pattern = regex_pattern.replace(py_format, regex)
 
-    return regex_pattern
+@lru_cache(maxsize=8)
+def _convert_date_format_to_regex(date_format: str) -> str:
+    """Convert a date format string to a regular expression pattern with a named group per field."""
+    return _DATE_DIRECTIVE_PATTERN.sub(lambda match: _DATE_FORMAT_MAP[match.group()], date_format)
 
 
-def _extract_date_from_filename(filename: str, prefix: str, date_format: str):
-    # Convert date format to regex pattern
+@lru_cache(maxsize=8)
+def _get_filename_pattern(prefix: str, date_format: str) -> re.Pattern:
+    """Compile the pattern matching a backup directory name, cached per prefix and date format."""
     date_regex = _convert_date_format_to_regex(date_format)
+    return re.compile(rf'{re.escape(prefix)}{date_regex}')
+
 
-    # Define the regular expression pattern for the filename format
-    pattern = re.compile(rf'{re.escape(prefix)}({date_regex})')
+def _extract_date_from_filename(filename: str, pattern: re.Pattern):
     match = pattern.search(filename)
 
     if match:
-        date_str = match.group(1)  # Extract the date portion
+        fields = match.groupdict()
         try:
-            # Convert the extracted date string to a datetime object
-            return datetime.strptime(date_str, date_format)
+            # Build the datetime from the matched fields, defaulting like strptime
+            return datetime(int(fields.get('Y', 1900)), int(fields.get('m', 1)), int(fields.get('d', 1)),
+                            int(fields.get('H', 0)), int(fields.get('M', 0)), int(fields.get('S', 0)))
         except ValueError:
-            print(
-                f"Error: Date format does not match for filename '{filename}'")
+            LOGGER.debug(
+                "Date format does not match for filename '%s'.", filename)
     else:
-        print(f"Filename '{filename}' does not match the expected format.")
+        LOGGER.debug("Filename '%s' does not match the expected format.", filename)
 
     return None
 
 
-def _save_json_log(path: str, name: str):
+def _search_items(gis: GIS, query: str):
+    """Yield every item in the organization matching the query, fetching one page of results at a time."""
+    # Unlike content.search, advanced_search does not limit results to the organization,
+    # so public items from other organizations would be backed up and deleted otherwise
+    query = f"({query}) AND accountid:{gis.properties.id}"
+    start = 1
+    while start != -1:
+        page = gis.content.advanced_search(
+            query=query, start=start, max_items=_SEARCH_PAGE_SIZE)
+        if not page['results']:
+            break
+        yield from page['results']
+        start = page['nextStart']
+
+
+def _save_json_log(path: str, name: str, force: bool = False):
     path = os.path.join(path, name + '.json')
-    with open(path, 'w') as f:
-        f.write(json.dumps(backup_log, indent=4))
+    # Items are backed up concurrently, so serialize writes to the log file
+    with _log_lock:
+        # Status changes arrive several times per item, only snapshot them periodically
+        now = time.monotonic()
+        if not force and now - _last_log_save[0] < _LOG_SAVE_INTERVAL:
+            return
+        _last_log_save[0] = now
+        # Write to a temporary file first so an interrupted write never corrupts the log
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w') as f:
+            f.write(json.dumps(backup_log, indent=4))
+        os.replace(temp_path, path)
+
+
+def _get_folder_size(folder_path: str) -> int:
+    """Return the total size in bytes of the files under folder_path."""
+    total_size = 0
+    # Walk with an explicit stack, DirEntry caches its type so each file costs one stat
+    directories = [folder_path]
+    while directories:
+        with os.scandir(directories.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                else:
+                    total_size += entry.stat().st_size
+    return total_size
+
+
+def _call_with_timeout(func, timeout: int, *args):
+    """Call a function in a daemon thread, raising TimeoutError if it runs longer than timeout seconds."""
+    outcome = {}
+
+    def target():
+        try:
+            func(*args)
+        except Exception as e:
+            outcome['error'] = e
 
+    thd = threading.Thread(target=target, daemon=True)
+    thd.start()
+    thd.join(timeout)
+    if thd.is_alive():
+        raise TimeoutError("Backup timed out for item.")
+    if 'error' in outcome:
+        raise outcome['error']
 
-def run(backup_directory: str, backup_directory_prefix: str, backup_file_suffix: str, backup_tags: list[str], directory_tags: list[str],  uncategorized_save_tag: str, backup_exclude_types: list[str], date_format: str, archive_number: int, gis: GIS, delete_backup_online: bool, ignore_existing: bool, timeout: int, max_retries=5) -> dict:
+
+def run(backup_directory: str, backup_directory_prefix: str, backup_file_suffix: str, backup_tags: list[str], directory_tags: list[str],  uncategorized_save_tag: str, backup_exclude_types: list[str], date_format: str, archive_number: int, gis: GIS, delete_backup_online: bool, ignore_existing: bool, timeout: int, max_retries=5, max_concurrent_downloads=8) -> dict:
     START_TIME = time.time()
     LOGGER.info("Beginning backup process...")
 
@@ -99,115 +158,137 @@ def run(backup_directory: str, backup_directory_prefix: str, backup_file_suffix:
     current_date = datetime.now().strftime(date_format)
     directory_name = backup_directory_prefix + current_date
     full_directory_path = os.path.join(backup_directory, directory_name)
+    # Directory each item is saved to, keyed by save tag
+    save_paths = {tag: os.path.join(full_directory_path, tag)
+                  for tag in (*directory_tags, uncategorized_save_tag)}
 
-    LOGGER.debug(f"Creating backup directory '{full_directory_path}'.")
+    LOGGER.debug("Creating backup directory '%s'.", full_directory_path)
 
     try:
         # Create the base directory
         os.makedirs(full_directory_path, exist_ok=False)
         LOGGER.info(
-            f"Base directory '{full_directory_path}' created successfully.")
+            "Base directory '%s' created successfully.", full_directory_path)
 
-        # Create each subdirectory inside the base directory
-        for name in directory_tags:
-            subdirectory_path = os.path.join(full_directory_path, name)
+        # Create each subdirectory inside the base directory, a tag may name a nested path
+        for subdirectory_path in save_paths.values():
             os.makedirs(subdirectory_path, exist_ok=True)
             LOGGER.info(
-                f"Subdirectory '{subdirectory_path}' created successfully")
+                "Subdirectory '%s' created successfully", subdirectory_path)
         backup_log['info']['date'] = current_date
         backup_log['info']['directory'] = full_directory_path
-        _save_json_log(full_directory_path, directory_name)
+        _save_json_log(full_directory_path, directory_name, force=True)
 
     except PermissionError:
         LOGGER.exception(
-            f"Permission denied while creating directory '{full_directory_path}' or its subdirectories.")
+            "Permission denied while creating directory '%s' or its subdirectories.", full_directory_path)
+        raise
     except FileExistsError:
         LOGGER.exception(
-            f"An error occured while creating directory, '{full_directory_path}' already exists.")
+            "An error occured while creating directory, '%s' already exists.", full_directory_path)
         raise
     except Exception:
         LOGGER.exception(
-            f"An error occurred while creating directory '{full_directory_path}' or its subdirectories.")
+            "An error occurred while creating directory '%s' or its subdirectories.", full_directory_path)
+        raise
 
     # ----- Delete old backups -----
     LOGGER.info("Removing old backups...")
 
-    # Delete old backup folders
-    while True:
-        # Get contents of backup directory
-        try:
-            entries = os.listdir(path=backup_directory)
-        except FileNotFoundError:
-            LOGGER.exception(f"Directory '{backup_directory}' not found.")
-            raise
-        except NotADirectoryError:
-            LOGGER.exception(
-                f"Error listing contents of directory. '{backup_directory}' is not a directory.")
-            raise
-        except PermissionError:
-            LOGGER.exception(
-                f"Permission denied for getting contents of directory '{backup_directory}'.")
-            raise
-        except Exception:
-            LOGGER.exception(
-                f"An error occured getting contents of directory '{backup_directory}'.")
-            raise
-
-        # Filter out entries that are not directories
-        existing_directories = [entry for entry in entries if os.path.isdir(
-            os.path.join(backup_directory, entry))]
-        LOGGER.debug(f'Found {len(existing_directories)} directories.')
-        if len(existing_directories) - 1 < archive_number:
-            break
-
-        oldest_date = None
-        oldest_filename = None
-
-        for filename in existing_directories:
-            date = _extract_date_from_filename(
-                filename, backup_directory_prefix, date_format)
-            if date:
-                if oldest_date is None or date < oldest_date:
-                    oldest_date = date
-                    oldest_filename = filename
+    # Get the directories inside the backup directory
+    try:
+        with os.scandir(backup_directory) as entries:
+            existing_directories = [(entry.name, entry.path)
+                                    for entry in entries if entry.is_dir(follow_symlinks=False)]
+    except FileNotFoundError:
+        LOGGER.exception("Directory '%s' not found.", backup_directory)
+        raise
+    except NotADirectoryError:
+        LOGGER.exception(
+            "Error listing contents of directory. '%s' is not a directory.", backup_directory)
+        raise
+    except PermissionError:
+        LOGGER.exception(
+            "Permission denied for getting contents of directory '%s'.", backup_directory)
+        raise
+    except Exception:
+        LOGGER.exception(
+            "An error occured getting contents of directory '%s'.", backup_directory)
+        raise
 
-        try:
-            delete_path = os.path.join(backup_directory, oldest_filename)
-            shutil.rmtree(path=delete_path)
-            LOGGER.info(f"Removed backup directory '{oldest_filename}'.")
-        except FileNotFoundError:
-            LOGGER.exception(f"Directory '{delete_path}' not found.")
-            raise
-        except PermissionError:
-            LOGGER.exception(
-                f"Permission denied for deleting '{delete_path}'.")
-            raise
-        except Exception:
-            LOGGER.exception(
-                f"An error occured deleting directory '{delete_path}'.")
-            raise
+    LOGGER.debug('Found %s directories.', len(existing_directories))
+
+    # Sort dated backups oldest first and delete the excess in one pass
+    filename_pattern = _get_filename_pattern(backup_directory_prefix, date_format)
+    dated_directories = []
+    for filename, path in existing_directories:
+        date = _extract_date_from_filename(filename, filename_pattern)
+        if date:
+            dated_directories.append((date, filename, path))
+    dated_directories.sort()
+    # Only dated backups count toward archive_number, and the backup made by
+    # this run is never a candidate for deletion
+    delete_count = max(0, len(dated_directories) - archive_number)
+    delete_candidates = [directory for directory in dated_directories
+                         if directory[1] != directory_name]
+
+    # Remove the old backups in parallel, each is a tree of many small files
+    with ThreadPoolExecutor(max_workers=_DELETE_WORKERS) as executor:
+        futures = {executor.submit(shutil.rmtree, delete_path): (oldest_filename, delete_path)
+                   for _, oldest_filename, delete_path in delete_candidates[:delete_count]}
+        for future in as_completed(futures):
+            oldest_filename, delete_path = futures[future]
+            try:
+                future.result()
+                LOGGER.info("Removed backup directory '%s'.", oldest_filename)
+            except FileNotFoundError:
+                LOGGER.exception("Directory '%s' not found.", delete_path)
+                raise
+            except PermissionError:
+                LOGGER.exception(
+                    "Permission denied for deleting '%s'.", delete_path)
+                raise
+            except Exception:
+                LOGGER.exception(
+                    "An error occured deleting directory '%s'.", delete_path)
+                raise
 
     LOGGER.info("Old backups deleted.")
 
     # ----- Start backup -----
     LOGGER.info("Backing up files...")
-    backup_count = [0]
+    # Counts finished backups for progress messages, next() is atomic across threads
+    completed_count = itertools.count(1)
+    # Export names only need to be unique within a run, so one random id plus a
+    # counter replaces a fresh uuid per item; the names still match existing_backup_pattern
+    run_id = uuid.uuid4().hex
+    export_count = itertools.count()
     # Search for items with the specified tags
-    search_query = "tags:(" + " OR ".join(backup_tags) + ")"
-    items = gis.content.search(query=search_query, max_items=1000)
-    existing_backup_pattern = rf"{backup_file_suffix}[0-9a-fA-F]{32}"
-    filtered_items = [item for item in items if item.type not in backup_exclude_types and (
-        re.search(existing_backup_pattern, item.title) is None and ignore_existing)]
+    # Quote each tag so multi-word tags are matched as a phrase by the portal
+    search_query = "tags:(" + " OR ".join(f'"{tag}"' for tag in backup_tags) + ")"
+    # Drop duplicate results so an item is never backed up twice, pages can
+    # overlap if items change while the search is running
+    items = list({item.id: item for item in _search_items(gis, search_query)}.values())
+    # Types are filtered here rather than in the query, the portal matches
+    # type:"Web Map" against "Web Mapping Application" as well
+    # Exported copies are titled with the suffix followed by a 32 digit hex id
+    existing_backup_pattern = re.compile(
+        re.escape(backup_file_suffix) + r'[0-9a-fA-F]{32}')
+    exclude_type_set = frozenset(backup_exclude_types)
+    filtered_items = [item for item in items if item.type not in exclude_type_set and not (
+        ignore_existing and existing_backup_pattern.search(item.title))]
     found_items = len(filtered_items)
     backup_log['info']['total items'] = found_items
-    _save_json_log(full_directory_path, directory_name)
+    _save_json_log(full_directory_path, directory_name, force=True)
     if found_items > 0:
         LOGGER.info(
-            f"Found {found_items} items with tags {backup_tags}, excluding types {backup_exclude_types}.")
-        LOGGER.info(f"Items found: {[item.title for item in filtered_items]}.")
+            "Found %s items with tags %s, excluding types %s.", found_items, backup_tags, backup_exclude_types)
+        # Only build the list of titles when it will actually be logged
+        if LOGGER.isEnabledFor(logging.INFO):
+            LOGGER.info("Items found: %s.", [item.title for item in filtered_items])
     else:
         LOGGER.error(
-            f"Found {found_items} items with tags {backup_tags}, excluding types {backup_exclude_types}. Aborting backup.")
+            "Found %s items with tags %s, excluding types %s. Aborting backup.", found_items, backup_tags, backup_exclude_types)
         exit()
 
     for item in filtered_items:
@@ -221,12 +302,20 @@ def run(backup_directory: str, backup_directory_prefix: str, backup_file_suffix:
             'error': None,
             'backup_path': None
         }
-        _save_json_log(full_directory_path, directory_name)
+    _save_json_log(full_directory_path, directory_name, force=True)
+
+    # Tags that map to a save directory, for constant time lookups per item
+    directory_tag_set = frozenset(directory_tags)
+
+    # A timed out attempt keeps running in its thread, so only the attempt recorded
+    # here for an item may update its log entry
+    current_attempts = {}
+    attempt_lock = threading.Lock()
+    attempt_ids = itertools.count()
 
     # Function to back up an item
 
-    def backup_item(item):
-        backup_count[0] += 1
+    def backup_item(item, attempt):
         # Function to delete an item
 
         def delete_item(item_name: str):
@@ -237,127 +326,171 @@ def run(backup_directory: str, backup_directory_prefix: str, backup_file_suffix:
                     try:
                         item.delete()
                         LOGGER.debug(
-                            f"Deleted item '{item_name}' successfully.")
+                            "Deleted item '%s' successfully.", item_name)
                     except Exception:
-                        LOGGER.exception(f"Error deleting item '{item_name}'.")
+                        LOGGER.exception("Error deleting item '%s'.", item_name)
             else:
-                LOGGER.debug(f"Unable to delete, '{item_name}' not found.")
+                LOGGER.debug("Unable to delete, '%s' not found.", item_name)
+
+        def update_log(key, value) -> bool:
+            """Set a field of the item's log entry, returning False if this attempt was superseded."""
+            with attempt_lock:
+                if current_attempts.get(item.id) != attempt:
+                    return False
+                item_log[key] = value
+            _save_json_log(full_directory_path, directory_name)
+            return True
+
+        # Read the item attributes once, the SDK resolves them through __getattr__
+        title, item_type, tags = item.title, item.type, item.tags
+        item_log = backup_log['items'][str(item.id)]
+        delete = False
         LOGGER.info(
-            f"Backing up '{item.title}' ({item.type}). ({backup_count[0]}/{found_items})")
-        backup_log['items'][str(item.id)]['status'] = 'BACKING'
-        _save_json_log(full_directory_path, directory_name)
+            "Backing up '%s' (%s).", title, item_type)
+        update_log('status', 'BACKING')
         try:
 
             # Build item save path
-            directory_tag = [tag for tag in item.tags if tag in directory_tags]
+            directory_tag = [tag for tag in tags if tag in directory_tag_set]
             if len(directory_tag) > 1:
-                LOGGER.warn(
-                    f"Multiple directory tags found for '{item.title}', {directory_tag}.")
+                LOGGER.warning(
+                    "Multiple directory tags found for '%s', %s.", title, directory_tag)
                 save_tag = directory_tag[0]
             elif len(directory_tag) < 1:
-                LOGGER.warn(f"No directory tag found for item '{item.title}'.")
+                LOGGER.warning("No directory tag found for item '%s'.", title)
                 save_tag = uncategorized_save_tag
             else:
                 save_tag = directory_tag[0]
 
-            save_path = os.path.join(full_directory_path, save_tag)
-
-            # Ensure thread-safe directory creation
-            if not os.path.exists(save_path):
-                if not os.path.exists(save_path):
-                    os.makedirs(save_path)
-            item_filename = item.title + backup_file_suffix + uuid.uuid4().hex
+            # Every save directory was created with the backup directory
+            save_path = save_paths[save_tag]
+            item_filename = title + backup_file_suffix + run_id + format(next(export_count), 'x')
             # Download item
-            if item.type in ['Feature Service', 'Vector Tile Service']:
-                LOGGER.info(f"Exporting '{item.title}' to GeoDatabase.")
+            if item_type in ['Feature Service', 'Vector Tile Service']:
+                LOGGER.info("Exporting '%s' to GeoDatabase.", title)
                 delete = True
 
-                backup_log['items'][str(item.id)]['status'] = 'EXPORTING'
-                _save_json_log(full_directory_path, directory_name)
+                update_log('status', 'EXPORTING')
                 export_item = item.export(
                     title=item_filename, export_format="File Geodatabase")
             else:
                 LOGGER.debug(
-                    f"The type of item '{item.title}' ({item.type}) does not have export capababilities.")
-                delete = False
+                    "The type of item '%s' (%s) does not have export capababilities.", title, item_type)
                 export_item = item
-            LOGGER.info(f"Downloading '{item.title}' to '{save_tag}'.")
+            LOGGER.info("Downloading '%s' to '%s'.", title, save_tag)
 
             # make this check/dynamically expand
 
-            backup_log['items'][str(item.id)]['status'] = 'DOWNLOADING'
-            backup_log['items'][str(item.id)]['backup_path'] = os.path.join(
-                save_path, item_filename)
-            _save_json_log(full_directory_path, directory_name)
-            export_item.download(save_path=save_path)
+            update_log('status', 'DOWNLOADING')
+            # The SDK names the file after the item and returns where it was written
+            download_path = export_item.download(save_path=save_path)
 
-            LOGGER.info(
-                f"Backup complete for '{item.title}'. ({backup_count[0]}/{found_items})")
+            if update_log('backup_path', download_path):
+                LOGGER.info(
+                    "Backup complete for '%s'. (%s/%s)", title, next(completed_count), found_items)
+            else:
+                LOGGER.warning(
+                    "Discarding download of '%s' from an attempt that timed out.", title)
+                # An export has a name of its own, so it would duplicate the retry's copy
+                if delete:
+                    os.remove(download_path)
             # Optionally, delete the exported item if you don't want to keep it online
             if delete_backup_online and delete:
                 delete_item(item_filename)
         except Exception:
-            LOGGER.error(f"Error with '{item.title}'.")
-            backup_count[0] -= 1
+            LOGGER.error("Error with '%s'.", title)
             if delete_backup_online and delete:
                 delete_item(item_filename)
             raise
 
     # ----- Start threads -----
     LOGGER.info("Starting backups...")
-    # Create a queue to hold items to be processed
-    request_queue = queue.Queue()
-    # Add items to the queue
-    for item in filtered_items:
-        # Add a tuple for each item containing the item and the number of retries
-        request_queue.put([item, 0])
 
-    while not request_queue.empty():
-        item = request_queue.get()
-        if item is None:
-            break
-        if item[1] < max_retries:
+    def attempt_backup(item):
+        attempt = next(attempt_ids)
+        with attempt_lock:
+            current_attempts[item.id] = attempt
+        try:
+            _call_with_timeout(backup_item, timeout, item, attempt)
+        except TimeoutError:
+            # Disown the attempt still running in the background before it is retried
+            with attempt_lock:
+                current_attempts[item.id] = None
+            raise
+
+    # Items that have neither succeeded nor used up their retries
+    unfinished_items = [found_items]
+    unfinished_lock = threading.Lock()
+    all_finished = threading.Event()
+
+    def finish_item():
+        with unfinished_lock:
+            unfinished_items[0] -= 1
+            if unfinished_items[0] == 0:
+                all_finished.set()
+
+    def submit_backup(item):
+        # The callback releases the future as soon as the attempt is handled
+        try:
+            executor.submit(attempt_backup, item).add_done_callback(
+                partial(handle_backup_result, item))
+        except Exception:
+            # Nothing will report back for this item, so stop waiting on it
+            LOGGER.exception("Error scheduling a backup of '%s'.", item.title)
+            backup_log['items'][str(item.id)]['status'] = 'FAILED'
+            finish_item()
+
+    def handle_backup_result(item, future):
+        finished = True
+        try:
+            item_log = backup_log['items'][str(item.id)]
             try:
-                thd = StoppableThread(target=backup_item, args=(item[0],))
-                thd.start()
-                thd.join(timeout)
-                if thd.is_alive():
-                    thd.stop()
-                    raise Exception("Backup timed out for item.")
-                backup_log['items'][str(item[0].id)]['success'] = True
-                backup_log['items'][str(item[0].id)]['status'] = 'COMPLETE'
-                _save_json_log(full_directory_path, directory_name)
+                future.result()
+                item_log['success'] = True
+                item_log['status'] = 'COMPLETE'
+                item_log['error'] = None
             except Exception as e:
                 LOGGER.exception(
-                    f"An error occured with item '{item[0].title}'.")
-                item[1] += 1
-                backup_log['items'][str(item[0].id)]['retries'] += 1
-                backup_log['items'][str(item[0].id)]['error'] = str(e)
-                _save_json_log(full_directory_path, directory_name)
-                request_queue.put(item)
-
-    def get_folder_size(folder_path):
-        total_size = 0
-        for dirpath, dirnames, filenames in os.walk(folder_path):
-            for filename in filenames:
-                file_path = os.path.join(dirpath, filename)
-                total_size += os.path.getsize(file_path)
-        return total_size
-
-    backup_log['info']['size'] = get_folder_size(
+                    "An error occured with item '%s'.", item.title)
+                item_log['retries'] += 1
+                item_log['error'] = str(e)
+                if item_log['retries'] < max_retries:
+                    # Back off before a retry so a struggling server is not hammered, the
+                    # timer waits outside the pool so no worker sits idle meanwhile
+                    retry = threading.Timer(
+                        min(2 ** item_log['retries'], _MAX_RETRY_DELAY), submit_backup, args=(item,))
+                    retry.daemon = True
+                    retry.start()
+                    # Only once the retry is scheduled does it own finishing the item
+                    finished = False
+                else:
+                    LOGGER.error(
+                        "Giving up on '%s' after %s attempts.", item.title, item_log['retries'])
+                    item_log['status'] = 'FAILED'
+            # Final statuses and errors are always written, only progress updates are throttled
+            _save_json_log(full_directory_path, directory_name, force=True)
+        finally:
+            # Runs even if the log write fails, otherwise the run would wait forever
+            if finished:
+                finish_item()
+
+    with ThreadPoolExecutor(max_workers=max_concurrent_downloads) as executor:
+        for item in filtered_items:
+            submit_backup(item)
+        # Retries are submitted from the callbacks, so keep the pool open until every item is done
+        all_finished.wait()
+
+    backup_log['info']['size'] = _get_folder_size(
         full_directory_path) / (1024 * 1024 * 1024)
-    backup_log['info']['backed up items'] = backup_count[0]
+    backed_up_items = sum(1 for value in backup_log['items'].values() if value['success'])
+    backup_log['info']['backed up items'] = backed_up_items
 
-    for key, value in backup_log['items'].items():
-        value = value['success']
-        if not value:
-            backup_log['info']['success'] = False
-            break
-        backup_log['info']['success'] = True
+    backup_log['info']['success'] = all(
+        value['success'] for value in backup_log['items'].values())
 
-    _save_json_log(full_directory_path, directory_name)
+    _save_json_log(full_directory_path, directory_name, force=True)
 
     END_TIME = time.time()
     LOGGER.info(
-        f"Backup complete - Items ({backup_count[0]}/{found_items}), Time ({END_TIME-START_TIME}s)")
+        "Backup complete - Items (%s/%s), Time (%ss)", backed_up_items, found_items, END_TIME-START_TIME)
     return backup_log